@@ -19,23 +19,207 @@ SymPy:
 - Идеально подходит для образовательных целей
 """
 
-import sympy as sp
-from sympy.parsing.sympy_parser import (
-    parse_expr,
-    standard_transformations,
-    implicit_multiplication_application,
-)
+import math
+import os
+import threading
+from functools import lru_cache
 
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.checkbox import CheckBox
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
+from kivy.uix.togglebutton import ToggleButton
+
+# Шаблоны текста результата - строки формата разбираются один раз
+_FMT_TWO = "Корни уравнения:\nx1 = {}\nx2 = {}".format
+_FMT_DOUBLE = "Корень уравнения (кратный):\nx = {}".format
+_FMT_ONE = "Решение уравнения:\nx = {}".format
+
+# Сколько готовых текстов результата хранит окно (как и кэш _solve_cached)
+_RESULTS_MAX = 128
+
+# SymPy импортируется лениво - при первом решении, а не при запуске.
+# Импорт занимает заметное время и задерживал бы появление окна
+sp = None
+parse_expr = None
 
 # Преобразования для парсера SymPy - позволяют использовать упрощенный синтаксис
 # Например: "2x" вместо "2*x", "x^2" преобразуется в "x**2"
-transformations = standard_transformations + (implicit_multiplication_application,)
+transformations = None
+
+# Символьная переменная x - создается один раз при загрузке SymPy
+X = None
+
+
+def _load_sympy():
+    """Импортирует SymPy при первом вызове и сохраняет нужные объекты в модуле"""
+    global sp, parse_expr, transformations, X
+    if sp is not None:
+        return
+
+    # Размер внутреннего кэша SymPy читается только при импорте, поэтому задается до него.
+    # gmpy2 (если установлен) SymPy подключает сам - дополнительная настройка не нужна
+    os.environ.setdefault("SYMPY_CACHE_SIZE", "10000")
+
+    import sympy
+    from sympy.parsing.sympy_parser import (
+        parse_expr as _parse_expr,
+        standard_transformations,
+        implicit_multiplication_application,
+    )
+
+    parse_expr = _parse_expr
+    transformations = standard_transformations + (implicit_multiplication_application,)
+    X = sympy.Symbol("x")
+    sp = sympy  # Присваивается последним - признак завершенной загрузки
+
+
+# Необязательное ускорение: JIT-компиляция формулы корней через numba.
+# Если numba не установлена, корни считаются символьно
+_quad = None
+_numba_loaded = False
+
+
+def _quad_roots(a, b, c):
+    """
+    Вещественные корни a*x^2 + b*x + c = 0 при D >= 0.
+    Второй корень считается как c/q, без вычитания близких чисел
+    """
+    d = b * b - 4 * a * c
+    s = d**0.5
+    q = -(b + math.copysign(s, b)) / 2
+    return q / a, c / q
+
+
+def _load_numba():
+    """Пытается один раз скомпилировать _quad_roots через numba"""
+    global _quad, _numba_loaded
+    if _numba_loaded:
+        return
+    _numba_loaded = True
+
+    try:
+        import numba
+    except ImportError:
+        return
+
+    _quad = numba.njit(cache=True)(_quad_roots)
+
+
+def _numeric_quad_roots(a, b, c):
+    """
+    Корни через _quad по вещественным коэффициентам SymPy.
+    Возвращает None, если числа не помещаются в float - тогда корни считаются символьно
+    """
+    exact = (a, b, c)
+    try:
+        coeffs = [float(k) for k in exact]
+        # Переполнение (inf) или потеря малого коэффициента (обнуление) искажают ответ
+        if any(not math.isfinite(f) or (f == 0.0 and not k.is_zero) for f, k in zip(coeffs, exact)):
+            return None
+        x1, x2 = _quad(*coeffs)
+    except (OverflowError, ZeroDivisionError):
+        return None
+
+    if not (math.isfinite(x1) and math.isfinite(x2)):
+        return None
+    return [sp.Float(x) for x in sorted((x1, x2))]
+
+
+@lru_cache(maxsize=256)
+def _parse(s):
+    """Разбирает строку в выражение SymPy; результат кэшируется по тексту"""
+    return parse_expr(s, transformations=transformations)
+
+
+def _closed_form_roots(poly, degree):
+    """
+    КОРНИ ЛИНЕЙНОГО И КВАДРАТНОГО МНОГОЧЛЕНА ПО ФОРМУЛАМ
+    Принимает уже известную степень многочлена.
+    Возвращает список корней или None, если степень не 1 и не 2
+    или коэффициенты не вещественные числа - тогда уравнение решает sp.solve
+    """
+    # Формулы не упрощают выражения с другими символами (sqrt(y**2) вместо y)
+    # и меняют порядок комплексных корней - такие случаи оставляем sp.solve
+    if not all(k.is_number and k.is_real for k in poly.all_coeffs()):
+        return None
+
+    if degree == 1:
+        # a*x + b = 0  =>  x = -b/a
+        return [-poly.nth(0) / poly.nth(1)]
+
+    if degree == 2:
+        # a*x^2 + b*x + c = 0  =>  x = (-b ± sqrt(D)) / (2a), D = b^2 - 4ac
+        a, b, c = poly.all_coeffs()
+        D = b * b - 4 * a * c
+        if D.is_zero:
+            return [-b / (2 * a)]  # Кратный корень
+        if _quad is not None and D.is_nonnegative:
+            # Вещественные корни - быстрый числовой путь
+            roots = _numeric_quad_roots(a, b, c)
+            if roots is not None:
+                return roots
+        if any(k.has(sp.Float) for k in (a, b, c)):
+            # С приближенными коэффициентами формула теряет точность при вычитании
+            # близких чисел (например, x**2 - 1e8*x + 1) - решаем через sp.solve
+            return None
+        sqrt_D = sp.sqrt(D)
+        roots = [(-b - sqrt_D) / (2 * a), (-b + sqrt_D) / (2 * a)]
+        if D.is_positive and a.is_negative:
+            roots.reverse()  # Вещественные корни выводятся по возрастанию
+        return roots
+
+    return None
+
+
+@lru_cache(maxsize=128)
+def _solve_cached(eq_text, equation_type):
+    """
+    РАЗБОР И РЕШЕНИЕ УРАВНЕНИЯ С КЭШИРОВАНИЕМ
+    Возвращает (solutions, degree). Повторное нажатие "Решить" для того же
+    уравнения берет результат из кэша, не вызывая SymPy заново
+    """
+    # partition за один проход и делит строку, и проверяет наличие "="
+    lhs_str, sep, rhs_str = eq_text.partition("=")
+    if not sep:
+        raise ValueError("Уравнение должно содержать знак '='")
+
+    _load_sympy()
+    _load_numba()
+
+    # ★ ЭТАП 2: ПАРСИНГ УРАВНЕНИЯ С ПОМОЩЬЮ SYMPY ★
+
+    # parse_expr преобразует строку в математическое выражение SymPy
+    lhs = _parse(lhs_str.strip())
+    rhs = _parse(rhs_str.strip())
+    # Переносим все в одну сторону: lhs - rhs = 0
+    # Add строится напрямую, минуя sympify-проверки оператора "-"
+    expr = sp.Add(lhs, -rhs)
+
+    # ★ ЭТАП 3: ПРОВЕРКА СООТВЕТСТВИЯ ТИПУ УРАВНЕНИЯ ★
+    # Многочлен строится один раз и используется и для степени, и для корней.
+    # Для не многочленов (например, 1/x) Poly выбрасывает PolynomialError
+    poly = sp.Poly(expr, X)
+    degree = poly.degree()  # Определяем степень уравнения
+
+    if equation_type == "linear" and degree > 1:
+        raise ValueError("Уравнение не линейное (степень > 1)")
+    if equation_type == "quadratic" and degree != 2:
+        raise ValueError("Уравнение не квадратное (степень должна быть 2)")
+
+    # ★ ЭТАП 4: РЕШЕНИЕ УРАВНЕНИЯ ★
+    # Для степени 1 и 2 корни считаются по готовым формулам из коэффициентов
+    # многочлена - это намного быстрее универсального sp.solve
+    solutions = _closed_form_roots(poly, degree)
+    if solutions is None:
+        solutions = sp.solve(poly, X)
+
+    # Кортеж вместо списка - закэшированный результат нельзя случайно изменить
+    solutions = tuple(solutions)
+
+    return solutions, degree
 
 
 class EquationSolver(BoxLayout):
@@ -52,26 +236,32 @@ class EquationSolver(BoxLayout):
         self.padding = 10  # Отступы от краев окна
         self.spacing = 10  # Расстояние между виджетами
 
+        # Номер текущего запроса: растет при каждом решении и очистке,
+        # чтобы результат устаревшего вычисления не попал на экран
+        self._solve_id = 0
+
+        # Готовые тексты результатов по ключу (eq_text, equation_type).
+        # Заполняется и читается только в главном потоке: повторное решение
+        # выводится сразу, без фонового потока и промежуточного "Вычисляю…"
+        self._results = {}
+
         # ★ БЛОК 1: ВЫБОР ТИПА УРАВНЕНИЯ ★
-        # Создаем горизонтальный контейнер для чекбоксов
+        # Создаем горизонтальный контейнер для переключателей
         self.checkbox_layout = BoxLayout(orientation="horizontal", size_hint=(1, 0.15))
         self.checkbox_layout.add_widget(Label(text="Выберите тип уравнения:"))
 
-        # Чекбокс для линейного уравнения
-        self.linear_layout = BoxLayout(orientation="horizontal", size_hint=(0.5, 1))
-        self.linear_check = CheckBox(group="equation_type", active=True)
-        self.linear_check.bind(active=self.on_checkbox_active)
-        self.linear_layout.add_widget(self.linear_check)
-        self.linear_layout.add_widget(Label(text="Линейное"))
-        self.checkbox_layout.add_widget(self.linear_layout)
-
-        # Чекбокс для квадратного уравнения
-        self.quadratic_layout = BoxLayout(orientation="horizontal", size_hint=(0.5, 1))
-        self.quadratic_check = CheckBox(group="equation_type")
-        self.quadratic_check.bind(active=self.on_checkbox_active)
-        self.quadratic_layout.add_widget(self.quadratic_check)
-        self.quadratic_layout.add_widget(Label(text="Квадратное"))
-        self.checkbox_layout.add_widget(self.quadratic_layout)
+        # Кнопки-переключатели одной группы: Kivy сам обеспечивает,
+        # что нажата только одна из них, allow_no_selection=False не дает
+        # отжать обе сразу
+        self.linear_btn = ToggleButton(
+            text="Линейное", group="eq", state="down", allow_no_selection=False
+        )
+        self.checkbox_layout.add_widget(self.linear_btn)
+
+        self.quadratic_btn = ToggleButton(
+            text="Квадратное", group="eq", allow_no_selection=False
+        )
+        self.checkbox_layout.add_widget(self.quadratic_btn)
 
         self.add_widget(self.checkbox_layout)
 
@@ -107,92 +297,120 @@ class EquationSolver(BoxLayout):
 
     def clear_fields(self, instance):
         """Очищает поле ввода и сбрасывает результат"""
+        self._solve_id += 1  # Результат уже идущего вычисления больше не нужен
+        # Не ждем брошенное вычисление - новое уравнение можно решать сразу
+        self.solve_button.disabled = False
         self.equation_input.text = ""
-        self.result_label.text = "Решение появится здесь"
+        self._set_result("Решение появится здесь")
 
-    def on_checkbox_active(self, checkbox, value):
-        """
-        Обработчик изменения состояния чекбоксов
-        Обеспечивает взаимное исключение - только один чекбокс активен
-        """
-        if value:  # Если чекбокс активируется
-            if checkbox == self.linear_check:
-                self.quadratic_check.active = False
-            else:
-                self.linear_check.active = False
+    def _set_result(self, txt):
+        """Обновляет поле результата, только если текст действительно изменился"""
+        if self.result_label.text != txt:
+            self.result_label.text = txt
 
     def format_solution(self, solution):
         """
         ФОРМАТИРОВАНИЕ РЕШЕНИЯ ДЛЯ КРАСИВОГО ВЫВОДА
         Использует SymPy для преобразования в числовой формат
         """
+        # Быстрый путь: вещественное число переводится в float напрямую, без sp.N().
+        # Числа вне диапазона float (например, 10**400 или 10**-400) форматирует sp.N()
+        if solution.is_number and solution.is_real:
+            try:
+                value = float(solution)
+            except OverflowError:
+                value = math.inf
+            if math.isfinite(value) and (value != 0.0 or solution.is_zero):
+                return f"{value:.4g}"  # 4 значащие цифры
+
         try:
             # sp.N() преобразует символьное выражение в числовое с заданной точностью
             numeric_value = sp.N(solution, n=4)  # n=4 - точность (4 значащие цифры)
             return str(numeric_value)
-        except:
+        except (TypeError, ValueError):
             # Если преобразование невозможно, возвращаем исходное решение
             return str(solution)
 
-    def solve(self, instance):
+    def solve(self, instance=None):
         """
         ОСНОВНОЙ МЕТОД РЕШЕНИЯ УРАВНЕНИЯ
-        Объединяет возможности Kivy (GUI) и SymPy (математика)
+        Объединяет возможности Kivy (GUI) и SymPy (математика).
+        Вычисления идут в отдельном потоке, чтобы интерфейс не зависал
         """
-        try:
-            # ★ ЭТАП 1: ОПРЕДЕЛЕНИЕ ТИПА УРАВНЕНИЯ ★
-            equation_type = "linear" if self.linear_check.active else "quadratic"
-            eq_text = self.equation_input.text.strip()
-
-            # Проверка ввода
-            if not eq_text:
-                raise ValueError("Введите уравнение")
-            if "=" not in eq_text:
-                raise ValueError("Уравнение должно содержать знак '='")
-
-            # ★ ЭТАП 2: ПАРСИНГ УРАВНЕНИЯ С ПОМОЩЬЮ SYMPY ★
-            lhs_str, rhs_str = eq_text.split("=", 1)
-
-            # parse_expr преобразует строку в математическое выражение SymPy
-            lhs = parse_expr(lhs_str, transformations=transformations)
-            rhs = parse_expr(rhs_str, transformations=transformations)
-            expr = lhs - rhs  # Переносим все в одну сторону: lhs - rhs = 0
+        # ★ ЭТАП 1: ОПРЕДЕЛЕНИЕ ТИПА УРАВНЕНИЯ ★
+        equation_type = "linear" if self.linear_btn.state == "down" else "quadratic"
+        # Нормализуем ввод один раз: "x^2" -> "x**2". Эта же строка служит
+        # ключом кэша, поэтому оба варианта записи дают одно попадание
+        eq_text = self.equation_input.text.strip().replace("^", "**")
+
+        # Проверка ввода
+        if not eq_text:
+            self._set_result("Ошибка: Введите уравнение")
+            return
+
+        key = (eq_text, equation_type)
+        cached_text = self._results.get(key)
+        if cached_text is not None:
+            self._solve_id += 1
+            self._set_result(cached_text)
+            return
+
+        # Кнопка блокируется до конца вычислений - повторное нажатие не запустит второй поток
+        self.solve_button.disabled = True
+        self._set_result("Вычисляю…")
+        self._solve_id += 1
+        solve_id = self._solve_id
+
+        def worker():
+            result_text = self._solve_sync(eq_text, equation_type)
+            # Виджеты Kivy можно менять только из главного потока
+            Clock.schedule_once(lambda dt: self._show_result(key, result_text, solve_id))
+
+        # daemon=True - долгое вычисление не мешает закрыть приложение
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_result(self, key, result_text, solve_id):
+        """
+        Запоминает и выводит результат, снова разрешает нажимать "Решить" (главный поток).
+        Если после запуска поля были очищены, результат только запоминается:
+        кнопку уже разблокировала очистка, и, возможно, идет новое вычисление
+        """
+        # Хранится не больше _RESULTS_MAX текстов - самый старый удаляется
+        if len(self._results) >= _RESULTS_MAX:
+            del self._results[next(iter(self._results))]
+        self._results[key] = result_text
 
-            # Создаем символьную переменную x
-            x = sp.symbols("x")
+        if solve_id == self._solve_id:
+            self._set_result(result_text)
+            self.solve_button.disabled = False
 
-            # ★ ЭТАП 3: ПРОВЕРКА СООТВЕТСТВИЯ ТИПУ УРАВНЕНИЯ ★
-            degree = sp.degree(expr, x)  # Определяем степень уравнения
+    def _solve_sync(self, eq_text, equation_type):
+        """
+        РЕШЕНИЕ И ФОРМАТИРОВАНИЕ БЕЗ ОБРАЩЕНИЯ К ВИДЖЕТАМ
+        Выполняется в фоновом потоке, возвращает готовый текст результата
+        """
+        try:
+            # ★ ЭТАПЫ 2-4: ПАРСИНГ, ПРОВЕРКА И РЕШЕНИЕ (С КЭШИРОВАНИЕМ) ★
+            solutions, degree = _solve_cached(eq_text, equation_type)
 
-            if equation_type == "linear" and degree > 1:
-                raise ValueError("Уравнение не линейное (степень > 1)")
-            if equation_type == "quadratic" and degree != 2:
-                raise ValueError("Уравнение не квадратное (степень должна быть 2)")
+            # ★ ЭТАП 5: ФОРМАТИРОВАНИЕ РЕЗУЛЬТАТА ★
+            if not solutions:
+                return "Уравнение не имеет решений"
 
-            # ★ ЭТАП 4: РЕШЕНИЕ УРАВНЕНИЯ СИМВОЛЬНЫМИ МЕТОДАМИ SYMPY ★
-            solutions = sp.solve(expr, x)
+            if equation_type == "quadratic":
+                if len(solutions) == 2:
+                    x1_formatted = self.format_solution(solutions[0])
+                    x2_formatted = self.format_solution(solutions[1])
+                    return _FMT_TWO(x1_formatted, x2_formatted)
+                x_formatted = self.format_solution(solutions[0])
+                return _FMT_DOUBLE(x_formatted)
 
-            # ★ ЭТАП 5: ФОРМАТИРОВАНИЕ И ВЫВОД РЕЗУЛЬТАТА ★
-            if not solutions:
-                result_text = "Уравнение не имеет решений"
-            else:
-                if equation_type == "quadratic":
-                    if len(solutions) == 2:
-                        x1_formatted = self.format_solution(solutions[0])
-                        x2_formatted = self.format_solution(solutions[1])
-                        result_text = f"Корни уравнения:\nx1 = {x1_formatted}\nx2 = {x2_formatted}"
-                    else:
-                        x_formatted = self.format_solution(solutions[0])
-                        result_text = f"Корень уравнения (кратный):\nx = {x_formatted}"
-                else:
-                    x_formatted = self.format_solution(solutions[0])
-                    result_text = f"Решение уравнения:\nx = {x_formatted}"
-
-            self.result_label.text = result_text
+            x_formatted = self.format_solution(solutions[0])
+            return _FMT_ONE(x_formatted)
 
         except Exception as e:
             # Обработка ошибок с информативным сообщением
-            self.result_label.text = f"Ошибка: {str(e)}"
+            return f"Ошибка: {str(e)}"
 
 
 class EquationSolverApp(App):